@@ -1,15 +1,87 @@
 import os
+import re
 import json
+import mmap
+import atexit
+import bisect
 import datetime
-from typing import Dict, List, Any, Optional
+import operator
+import shutil
+import signal
+from time import monotonic
+from typing import Callable, Dict, List, Any, Optional, Tuple
 import sys
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+DEFAULT_DATA_FILE = "planner_data.json"
+MSGPACK_DATA_FILE = "planner_data.msgpack"
+
+
+def _default_data_file() -> str:
+    """Pick the data file to use when none is given."""
+    # Once a MessagePack file exists it is always used, so installing or
+    # removing msgpack never silently switches to different data
+    if os.path.exists(MSGPACK_DATA_FILE) or msgpack is not None:
+        return MSGPACK_DATA_FILE
+    return DEFAULT_DATA_FILE
+
+
+def _is_msgpack(path: str) -> bool:
+    """Return True if the path should be stored as MessagePack."""
+    return path.endswith(".msgpack")
+
+
+def _dumps(data: Any, use_msgpack: bool = False, pretty: bool = False) -> bytes:
+    """Serialize planner data to bytes, as MessagePack or JSON (compact unless pretty)."""
+    if use_msgpack:
+        return msgpack.packb(data, use_bin_type=True)
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else None)
+    if pretty:
+        return json.dumps(data, indent=2).encode("utf-8")
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+def _loads(raw: memoryview, use_msgpack: bool = False) -> Any:
+    """Parse planner data from MessagePack or JSON bytes."""
+    if use_msgpack:
+        return msgpack.unpackb(raw, raw=False)
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(bytes(raw))
+
+
+_VALID_HH = frozenset(f"{h:02d}" for h in range(24))
+_VALID_MM = frozenset(f"{m:02d}" for m in range(60))
+_DATE_RE = re.compile(r"\d{4}-\d{1,2}-\d{1,2}")
+
+
+def _is_time(part: str) -> bool:
+    """Return True if part is a valid 24-hour HH:MM time."""
+    return len(part) == 5 and part[2] == ":" and part[:2] in _VALID_HH and part[3:] in _VALID_MM
+
+
+_task_sort_key = operator.attrgetter("_sort_key")
+
+
 class Task:
-    def __init__(self, description: str, time: str = "", completed: bool = False, task_id: Optional[int] = None):
-        self.id = task_id if task_id is not None else int(datetime.datetime.now().timestamp())
+    __slots__ = ("id", "description", "time", "completed", "_sort_key")
+    
+    def __init__(self, description: str, time: str = "", completed: bool = False, *, task_id: int):
+        self.id = task_id
         self.description = description
         self.time = time
         self.completed = completed
+        self._sort_key = time or "23:59"
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -21,94 +93,232 @@ class Task:
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Task':
-        return cls(
-            description=data["description"],
-            time=data.get("time", ""),
-            completed=data.get("completed", False),
-            task_id=data.get("id")
-        )
+        # Assign slots directly; this runs once per task when a date is loaded
+        task = cls.__new__(cls)
+        task.id = data["id"]
+        task.description = data["description"]
+        task.time = time = data.get("time", "")
+        task.completed = data.get("completed", False)
+        task._sort_key = time or "23:59"
+        return task
 
 
 class DailyPlanner:
-    def __init__(self, data_file: str = "planner_data.json"):
+    def __init__(self, data_file: Optional[str] = None, pretty: bool = False):
+        if data_file is None:
+            data_file = _default_data_file()
+        if _is_msgpack(data_file) and msgpack is None:
+            raise RuntimeError(f"{data_file} is a MessagePack file; install the msgpack package to use it.")
         self.data_file = data_file
+        self.pretty = pretty
         self.tasks: Dict[str, List[Task]] = {}
+        # Serialization-ready task dicts for dates whose Task objects have
+        # not been built yet
+        self._serialized: Dict[str, List[Dict[str, Any]]] = {}
+        self._by_id: Dict[int, Task] = {}
+        self._date_of: Dict[int, str] = {}
+        self._next_id = 1
+        self._today_cache: Tuple[float, datetime.date, str] = (float("-inf"), datetime.date.min, "")
+        self._dirty = False
+        self._pending = 0
+        self._flush_threshold = 16
+        self._flush_interval = 2.0
+        self._last_save = monotonic()
         self.load_data()
     
     def load_data(self) -> None:
         """Load tasks from the data file."""
-        if os.path.exists(self.data_file):
+        path = self.data_file
+        if _is_msgpack(path) and not os.path.exists(path):
+            # Fall back to a JSON file from before the switch to MessagePack
+            legacy_path = os.path.splitext(path)[0] + ".json"
+            if os.path.exists(legacy_path):
+                path = legacy_path
+        
+        if os.path.exists(path):
             try:
-                with open(self.data_file, "r") as f:
-                    data = json.load(f)
-                    for date, tasks in data.items():
-                        self.tasks[date] = [Task.from_dict(task) for task in tasks]
-            except (json.JSONDecodeError, KeyError):
+                # Parse straight from the page cache instead of copying the file
+                with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    with memoryview(mm) as view:
+                        data = _loads(view, _is_msgpack(path))
+                
+                # Tasks stay as plain dicts until their date is first used
+                self._serialized = data
+                seen = set()
+                needs_id = []
+                for tasks in data.values():
+                    for task in tasks:
+                        # Check each task up front, since it is only built on first use
+                        if "description" not in task:
+                            raise KeyError("description")
+                        task_id = task.get("id")
+                        if task_id is not None and not isinstance(task_id, int):
+                            raise ValueError(f"invalid task id: {task_id!r}")
+                        # Older files may hold missing or clashing timestamp ids
+                        if task_id is None or task_id in seen:
+                            needs_id.append(task)
+                        else:
+                            seen.add(task_id)
+                
+                self._next_id = max(seen, default=0) + 1
+                for task in needs_id:
+                    task["id"] = self._new_id()
+                
+                if needs_id or path != self.data_file:
+                    self._mark_dirty()
+            except (ValueError, KeyError):
                 print("Error loading planner data. Starting with empty planner.")
                 self.tasks = {}
+                self._serialized = {}
+                self._by_id = {}
+                self._date_of = {}
+                self._next_id = 1
     
     def save_data(self) -> None:
         """Save tasks to the data file."""
-        data = {}
+        # Dates never turned into Task objects are written back as loaded
+        data = dict(self._serialized)
         for date, tasks in self.tasks.items():
             data[date] = [task.to_dict() for task in tasks]
         
-        with open(self.data_file, "w") as f:
-            json.dump(data, f, indent=2)
+        # Write to a temporary file and rename it over the old one, so a
+        # crash mid-write never leaves a truncated data file behind
+        tmp_file = self.data_file + ".tmp"
+        try:
+            with open(tmp_file, "wb") as f:
+                f.write(_dumps(data, _is_msgpack(self.data_file), self.pretty))
+                f.flush()
+                os.fsync(f.fileno())
+            if os.path.exists(self.data_file):
+                shutil.copymode(self.data_file, tmp_file)
+            os.replace(tmp_file, self.data_file)
+        except BaseException:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+            raise
+        
+        if os.name == "posix":
+            # Make the rename itself durable by syncing the directory entry
+            dir_fd = os.open(os.path.dirname(os.path.abspath(self.data_file)), os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        self._dirty = False
+        self._pending = 0
+        self._last_save = monotonic()
+    
+    def _mark_dirty(self) -> None:
+        """Record a pending change, saving once enough changes or time have accumulated."""
+        self._dirty = True
+        self._pending += 1
+        if self._pending >= self._flush_threshold or monotonic() - self._last_save >= self._flush_interval:
+            self.save_data()
+    
+    def flush(self) -> None:
+        """Save any pending changes to the data file."""
+        if self._dirty:
+            self.save_data()
+    
+    def _new_id(self) -> int:
+        """Return the next unused task id."""
+        task_id = self._next_id
+        self._next_id += 1
+        return task_id
+    
+    def _load_day(self, date_key: str) -> Optional[List[Task]]:
+        """Return the task list for a date, building it from the loaded data on first use."""
+        tasks = self.tasks.get(date_key)
+        if tasks is None:
+            # From here on the Task objects are the only copy of this date
+            raw = self._serialized.pop(date_key, None)
+            if raw is None:
+                return None
+            tasks = [Task.from_dict(task) for task in raw]
+            tasks.sort(key=_task_sort_key)
+            for task in tasks:
+                self._index_task(task, date_key)
+            self.tasks[date_key] = tasks
+        return tasks
+    
+    def _index_task(self, task: Task, date_key: str) -> None:
+        """Register a task in the id lookup tables."""
+        self._by_id[task.id] = task
+        self._date_of[task.id] = date_key
+    
+    def _find_task(self, task_id: int, date_key: str) -> Optional[Task]:
+        """Look up a task by id, restricted to the given date."""
+        self._load_day(date_key)
+        if self._date_of.get(task_id) != date_key:
+            return None
+        return self._by_id.get(task_id)
+    
+    def _today(self) -> Tuple[datetime.date, str]:
+        """Return today's date and key, reused for a second rather than rebuilt per call."""
+        cached_at, today, key = self._today_cache
+        now = monotonic()
+        if now - cached_at >= 1.0:
+            today = datetime.date.today()
+            key = today.isoformat()
+            self._today_cache = (now, today, key)
+        return today, key
     
     def get_date_key(self, date: Optional[datetime.date] = None) -> str:
         """Get string key for the provided date."""
         if date is None:
-            date = datetime.date.today()
+            return self._today()[1]
         return date.isoformat()
     
     def add_task(self, description: str, time: str = "", date: Optional[datetime.date] = None) -> None:
         """Add a new task for the specified date."""
         date_key = self.get_date_key(date)
         
-        if date_key not in self.tasks:
-            self.tasks[date_key] = []
+        tasks = self._load_day(date_key)
+        if tasks is None:
+            tasks = self.tasks[date_key] = []
         
-        task = Task(description=description, time=time)
-        self.tasks[date_key].append(task)
-        self.save_data()
+        task = Task(description=description, time=time, task_id=self._new_id())
+        # Keep each day's list ordered by time so display needs no sort
+        bisect.insort(tasks, task, key=_task_sort_key)
+        self._index_task(task, date_key)
+        self._mark_dirty()
         print(f"Task added: {description}")
     
     def get_tasks(self, date: Optional[datetime.date] = None) -> List[Task]:
         """Get all tasks for the specified date."""
         date_key = self.get_date_key(date)
-        return self.tasks.get(date_key, [])
+        return self._load_day(date_key) or []
     
     def complete_task(self, task_id: int, date: Optional[datetime.date] = None) -> bool:
         """Mark a task as completed."""
-        date_key = self.get_date_key(date)
+        task = self._find_task(task_id, self.get_date_key(date))
         
-        if date_key in self.tasks:
-            for task in self.tasks[date_key]:
-                if task.id == task_id:
-                    task.completed = not task.completed
-                    status = "completed" if task.completed else "uncompleted"
-                    print(f"Task '{task.description}' marked as {status}.")
-                    self.save_data()
-                    return True
+        if task is not None:
+            task.completed = not task.completed
+            status = "completed" if task.completed else "uncompleted"
+            print(f"Task '{task.description}' marked as {status}.")
+            self._mark_dirty()
+            return True
         
         print("Task not found.")
         return False
     
     def update_task(self, task_id: int, description: str = None, time: str = None, date: Optional[datetime.date] = None) -> bool:
         """Update a task's details."""
-        date_key = self.get_date_key(date)
+        task = self._find_task(task_id, self.get_date_key(date))
         
-        if date_key in self.tasks:
-            for task in self.tasks[date_key]:
-                if task.id == task_id:
-                    if description:
-                        task.description = description
-                    if time is not None:
-                        task.time = time
-                    print(f"Task updated: {task.description}")
-                    self.save_data()
-                    return True
+        if task is not None:
+            if description:
+                task.description = description
+            if time is not None:
+                task.time = time
+                task._sort_key = time or "23:59"
+                tasks = self.tasks[self._date_of[task_id]]
+                tasks.remove(task)
+                bisect.insort(tasks, task, key=_task_sort_key)
+            print(f"Task updated: {task.description}")
+            self._mark_dirty()
+            return True
         
         print("Task not found.")
         return False
@@ -116,14 +326,15 @@ class DailyPlanner:
     def delete_task(self, task_id: int, date: Optional[datetime.date] = None) -> bool:
         """Delete a task."""
         date_key = self.get_date_key(date)
+        task = self._find_task(task_id, date_key)
         
-        if date_key in self.tasks:
-            for i, task in enumerate(self.tasks[date_key]):
-                if task.id == task_id:
-                    deleted_task = self.tasks[date_key].pop(i)
-                    print(f"Task deleted: {deleted_task.description}")
-                    self.save_data()
-                    return True
+        if task is not None:
+            self.tasks[date_key].remove(task)
+            del self._by_id[task_id]
+            del self._date_of[task_id]
+            print(f"Task deleted: {task.description}")
+            self._mark_dirty()
+            return True
         
         print("Task not found.")
         return False
@@ -131,38 +342,41 @@ class DailyPlanner:
     def display_tasks(self, date: Optional[datetime.date] = None) -> None:
         """Display tasks for the specified date."""
         if date is None:
-            date = datetime.date.today()
+            date, date_key = self._today()
+        else:
+            date_key = date.isoformat()
         
-        date_key = self.get_date_key(date)
-        tasks = self.tasks.get(date_key, [])
+        sys.stdout.write(self._render_day(date, date_key))
+    
+    def _render_day(self, date: datetime.date, date_key: str) -> str:
+        """Return the display text for a date's tasks."""
+        tasks = self._load_day(date_key) or []
         
-        date_str = date.strftime("%A, %B %d, %Y")
-        print(f"\n--- Tasks for {date_str} ---")
+        lines = [f"\n--- Tasks for {date:%A, %B %d, %Y} ---"]
         
         if not tasks:
-            print("No tasks scheduled for today.")
-            return
-        
-        # Sort tasks by time
-        tasks.sort(key=lambda t: t.time if t.time else "23:59")
+            lines.append("No tasks scheduled for today.")
         
         for i, task in enumerate(tasks, 1):
             status = "✓" if task.completed else " "
             time_str = f"{task.time} - " if task.time else ""
-            print(f"{i}. [{status}] {time_str}{task.description} (ID: {task.id})")
+            lines.append(f"{i}. [{status}] {time_str}{task.description} (ID: {task.id})")
+        
+        return "\n".join(lines) + "\n"
     
     def display_week(self, start_date: Optional[datetime.date] = None) -> None:
         """Display tasks for the week starting from start_date."""
         if start_date is None:
             # Start from current week's Monday
-            today = datetime.date.today()
+            today, _ = self._today()
             start_date = today - datetime.timedelta(days=today.weekday())
         
-        print("\n--- Weekly Schedule ---")
-        for i in range(7):
-            current_date = start_date + datetime.timedelta(days=i)
-            self.display_tasks(current_date)
-            print()
+        dates = [start_date + datetime.timedelta(days=i) for i in range(7)]
+        date_keys = [date.isoformat() for date in dates]
+        
+        # Render each day to its own chunk and write the week in one go
+        days = [self._render_day(current_date, date_key) + "\n" for current_date, date_key in zip(dates, date_keys)]
+        sys.stdout.write("\n--- Weekly Schedule ---\n" + "".join(days))
 
 
 def parse_date(date_str: str) -> datetime.date:
@@ -190,8 +404,144 @@ def print_help() -> None:
     print("Times should be in 24-hour format HH:MM")
 
 
+def _cmd_exit(planner: DailyPlanner, parts: List[str]) -> bool:
+    """Save pending changes and end the session."""
+    planner.flush()
+    print("Goodbye!")
+    return True
+
+
+def _cmd_help(planner: DailyPlanner, parts: List[str]) -> None:
+    """Show the command list."""
+    print_help()
+
+
+def _cmd_add(planner: DailyPlanner, parts: List[str]) -> None:
+    """Add a task, picking out an optional time and date."""
+    if len(parts) < 2:
+        print("Usage: add <description> [time] [date]")
+        return
+    
+    description = " ".join(parts[1:])
+    time = ""
+    date = None
+    
+    # Check if the last part is a date
+    if len(parts) >= 3 and _DATE_RE.fullmatch(parts[-1]):
+        date = parse_date(parts[-1])
+        description = " ".join(parts[1:-1])
+    
+    # Check if there's a time (format HH:MM)
+    for i, part in enumerate(parts[1:], 1):
+        if _is_time(part):
+            time = part
+            description = " ".join(parts[1:i] + parts[i+1:])
+            if date is not None:
+                description = " ".join(description.split()[:-1])
+            break
+    
+    planner.add_task(description, time, date)
+
+
+def _cmd_list(planner: DailyPlanner, parts: List[str]) -> None:
+    """List tasks for a date."""
+    date = None
+    if len(parts) > 1:
+        date = parse_date(parts[1])
+    planner.display_tasks(date)
+
+
+def _cmd_week(planner: DailyPlanner, parts: List[str]) -> None:
+    """Show the weekly schedule."""
+    start_date = None
+    if len(parts) > 1:
+        start_date = parse_date(parts[1])
+    planner.display_week(start_date)
+
+
+def _cmd_complete(planner: DailyPlanner, parts: List[str]) -> None:
+    """Toggle a task's completed state."""
+    if len(parts) != 2:
+        print("Usage: complete <task_id>")
+        return
+    try:
+        task_id = int(parts[1])
+        planner.complete_task(task_id)
+    except ValueError:
+        print("Task ID must be a number.")
+
+
+def _cmd_update(planner: DailyPlanner, parts: List[str]) -> None:
+    """Change a task's description."""
+    if len(parts) < 3:
+        print("Usage: update <task_id> <new description>")
+        return
+    try:
+        task_id = int(parts[1])
+        description = " ".join(parts[2:])
+        planner.update_task(task_id, description=description)
+    except ValueError:
+        print("Task ID must be a number.")
+
+
+def _cmd_time(planner: DailyPlanner, parts: List[str]) -> None:
+    """Change a task's time."""
+    if len(parts) != 3:
+        print("Usage: time <task_id> <time>")
+        return
+    try:
+        task_id = int(parts[1])
+        time = parts[2]
+        planner.update_task(task_id, time=time)
+    except ValueError:
+        print("Task ID must be a number.")
+
+
+def _cmd_delete(planner: DailyPlanner, parts: List[str]) -> None:
+    """Delete a task."""
+    if len(parts) != 2:
+        print("Usage: delete <task_id>")
+        return
+    try:
+        task_id = int(parts[1])
+        planner.delete_task(task_id)
+    except ValueError:
+        print("Task ID must be a number.")
+
+
+# Command handlers take the planner and the tokenized input; a handler
+# returns True to end the session.
+COMMANDS: Dict[str, Callable[[DailyPlanner, List[str]], Optional[bool]]] = {
+    "exit": _cmd_exit,
+    "help": _cmd_help,
+    "add": _cmd_add,
+    "list": _cmd_list,
+    "week": _cmd_week,
+    "complete": _cmd_complete,
+    "update": _cmd_update,
+    "time": _cmd_time,
+    "delete": _cmd_delete,
+}
+
+
 def main() -> None:
+    try:
+        # Gives input() line editing and history where available
+        import readline  # noqa: F401
+    except ImportError:
+        pass
+    
     planner = DailyPlanner()
+    atexit.register(planner.flush)
+    
+    def handle_signal(signum: int, frame: Any) -> None:
+        # atexit hooks do not run when the process is killed by a signal
+        planner.flush()
+        sys.exit(128 + signum)
+    
+    for name in ("SIGTERM", "SIGHUP"):
+        if hasattr(signal, name):
+            signal.signal(getattr(signal, name), handle_signal)
     
     print("=== Daily Planner ===")
     print("Type 'help' for a list of commands.")
@@ -209,103 +559,15 @@ def main() -> None:
             parts = user_input.split()
             command = parts[0].lower()
             
-            if command == "exit":
-                print("Goodbye!")
-                break
-                
-            elif command == "help":
-                print_help()
-                
-            elif command == "add":
-                if len(parts) < 2:
-                    print("Usage: add <description> [time] [date]")
-                    continue
-                
-                description = " ".join(parts[1:])
-                time = ""
-                date = None
-                
-                # Check if the last part is a date
-                if len(parts) >= 3 and "-" in parts[-1] and parts[-1].count("-") == 2:
-                    date = parse_date(parts[-1])
-                    description = " ".join(parts[1:-1])
-                
-                # Check if there's a time (format HH:MM)
-                for i, part in enumerate(parts[1:], 1):
-                    if ":" in part and len(part) == 5 and part[2] == ":":
-                        try:
-                            # Validate time format
-                            hour, minute = map(int, part.split(":"))
-                            if 0 <= hour <= 23 and 0 <= minute <= 59:
-                                time = part
-                                description = " ".join(parts[1:i] + parts[i+1:])
-                                if date is not None:
-                                    description = " ".join(description.split()[:-1])
-                                break
-                        except ValueError:
-                            pass
-                
-                planner.add_task(description, time, date)
-                
-            elif command == "list":
-                date = None
-                if len(parts) > 1:
-                    date = parse_date(parts[1])
-                planner.display_tasks(date)
-                
-            elif command == "week":
-                start_date = None
-                if len(parts) > 1:
-                    start_date = parse_date(parts[1])
-                planner.display_week(start_date)
-                
-            elif command == "complete":
-                if len(parts) != 2:
-                    print("Usage: complete <task_id>")
-                    continue
-                try:
-                    task_id = int(parts[1])
-                    planner.complete_task(task_id)
-                except ValueError:
-                    print("Task ID must be a number.")
-                
-            elif command == "update":
-                if len(parts) < 3:
-                    print("Usage: update <task_id> <new description>")
-                    continue
-                try:
-                    task_id = int(parts[1])
-                    description = " ".join(parts[2:])
-                    planner.update_task(task_id, description=description)
-                except ValueError:
-                    print("Task ID must be a number.")
-                
-            elif command == "time":
-                if len(parts) != 3:
-                    print("Usage: time <task_id> <time>")
-                    continue
-                try:
-                    task_id = int(parts[1])
-                    time = parts[2]
-                    planner.update_task(task_id, time=time)
-                except ValueError:
-                    print("Task ID must be a number.")
-                
-            elif command == "delete":
-                if len(parts) != 2:
-                    print("Usage: delete <task_id>")
-                    continue
-                try:
-                    task_id = int(parts[1])
-                    planner.delete_task(task_id)
-                except ValueError:
-                    print("Task ID must be a number.")
-                
-            else:
+            handler = COMMANDS.get(command)
+            if handler is None:
                 print(f"Unknown command: {command}")
                 print("Type 'help' for available commands.")
+            elif handler(planner, parts):
+                break
                 
-        except KeyboardInterrupt:
+        except (KeyboardInterrupt, EOFError):
+            planner.flush()
             print("\nExiting planner...")
             break
         except Exception as e: